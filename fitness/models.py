@@ -1,8 +1,8 @@
-from django.db import models
+from django.db import models, connections, router, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from django.db.models import Sum
+from django.db.models import Sum, Count, F
 
 class Activity(models.Model):
     """
@@ -31,11 +31,24 @@ class Activity(models.Model):
     date = models.DateField(default=timezone.now)
 
     class Meta:
-        ordering = ['-date']
+        ordering = ['-date', '-id']
+        indexes = [
+            # Serves the per-user filter and the default ordering
+            models.Index(fields=['user', '-date', '-id'], name='act_user_date_id_idx'),
+            models.Index(fields=['user', 'activity_type', '-date'], name='act_user_type_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.activity_type} - {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the activity and the leaderboard adjustment made by the save signals atomically.
+        """
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
 class Leaderboard(models.Model):
     """
     Model representing a leaderboard entry for a user, summarizing their activities by month and year.
@@ -56,6 +69,12 @@ class Leaderboard(models.Model):
     class Meta:
         unique_together = ['user', 'month', 'year']
         ordering = ['-year', '-month', '-total_activities']
+        indexes = [
+            models.Index(
+                fields=['year', 'month', '-total_activities', '-total_distance', '-total_calories_burned', '-id'],
+                name='lb_period_ranking_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.month}/{self.year} Leaderboard"
@@ -65,21 +84,97 @@ class Leaderboard(models.Model):
         """
         Update the leaderboard entry for a user based on their activities for a specific month and year.
         Aggregates total activities, distance, and calories burned.
+        The user may be given as a User instance or its primary key.
         """
-        # Aggregate activities for the user by month and year
-        activities = Activity.objects.filter(user=user, date__month=month, date__year=year)
-        
-        total_activities = activities.count()
-        total_distance = activities.aggregate(Sum('distance'))['distance__sum'] or 0
-        total_calories_burned = activities.aggregate(Sum('calories_burned'))['calories_burned__sum'] or 0
+        user_id = getattr(user, 'pk', user)
+
+        # Aggregate activities for the user by month and year in a single query
+        totals = Activity.objects.filter(user_id=user_id, date__month=month, date__year=year).aggregate(
+            total_activities=Count('id'),
+            total_distance=Sum('distance'),
+            total_calories_burned=Sum('calories_burned'),
+        )
 
         # Create or update the leaderboard entry for the user
         leaderboard_entry, created = cls.objects.update_or_create(
-            user=user, month=month, year=year,
+            user_id=user_id, month=month, year=year,
             defaults={
-                'total_activities': total_activities,
-                'total_distance': total_distance,
-                'total_calories_burned': total_calories_burned
+                'total_activities': totals['total_activities'],
+                'total_distance': totals['total_distance'] or 0,
+                'total_calories_burned': totals['total_calories_burned'] or 0
             }
         )
         return leaderboard_entry
+
+    @classmethod
+    def apply_activity_delta(cls, user_id, month, year, activities=0, distance=0, calories_burned=0):
+        """
+        Incrementally adjust the leaderboard entry for a user (by primary key) by the given deltas.
+        When activities are added, an empty entry is created first if none exists, so the
+        delta always lands on a row. Entries holding activities logged before they were
+        tracked incrementally can be rebuilt with bulk_refresh.
+        """
+        entries = cls.objects.filter(user_id=user_id, month=month, year=year)
+        if activities > 0:
+            # Insert before updating: concurrent first writes for the same entry then queue on
+            # the new row instead of racing (or deadlocking on gap locks) to create it
+            cls.objects.bulk_create([cls(user_id=user_id, month=month, year=year)], ignore_conflicts=True)
+        entries.update(
+            total_activities=F('total_activities') + activities,
+            total_distance=F('total_distance') + distance,
+            total_calories_burned=F('total_calories_burned') + calories_burned,
+        )
+
+    @classmethod
+    def bulk_refresh(cls, month, year, batch_size=2000):
+        """
+        Rebuild the leaderboard entries of every user for a specific month and year.
+        Aggregates all users in one grouped query and upserts the results in batches,
+        so only one batch of model instances is held at a time. The refresh is atomic.
+        Note that on MySQL the driver still loads the whole aggregate result client-side.
+        Returns the number of entries refreshed.
+        """
+        activities = Activity.objects.filter(date__month=month, date__year=year)
+        totals = activities.values('user_id').annotate(
+            total_activities=Count('id'),
+            total_distance=Sum('distance'),
+            total_calories_burned=Sum('calories_burned'),
+        )
+
+        # Backends such as MySQL upsert on any unique key and reject an explicit conflict target
+        unique_fields = None
+        if connections[cls.objects.db].features.supports_update_conflicts_with_target:
+            unique_fields = ['user', 'month', 'year']
+
+        def flush(batch):
+            cls.objects.bulk_create(
+                batch,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=['total_activities', 'total_distance', 'total_calories_burned'],
+            )
+
+        with transaction.atomic(using=cls.objects.db):
+            refreshed = 0
+            batch = []
+            for row in totals.iterator(chunk_size=batch_size):
+                batch.append(cls(
+                    user_id=row['user_id'], month=month, year=year,
+                    total_activities=row['total_activities'],
+                    total_distance=row['total_distance'] or 0,
+                    total_calories_burned=row['total_calories_burned'] or 0,
+                ))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    refreshed += len(batch)
+                    batch.clear()
+            if batch:
+                flush(batch)
+                refreshed += len(batch)
+
+            # Users with no activities left in the period keep an entry, but with zero totals
+            cls.objects.filter(month=month, year=year).exclude(
+                user_id__in=activities.values('user_id')
+            ).update(total_activities=0, total_distance=0, total_calories_burned=0)
+        return refreshed
@@ -2,6 +2,9 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Activity, Leaderboard
 
+# Activity types that require a distance to be logged
+_DISTANCE_ACTIVITIES = frozenset({'Running', 'Cycling', 'Swimming', 'Walking'})
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -44,7 +47,7 @@ class ActivitySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'date': 'This field is required.'})
 
         # If distance-based activity, ensure distance is provided
-        if activity_type in ['Running', 'Cycling', 'Swimming', 'Walking']:
+        if activity_type in _DISTANCE_ACTIVITIES:
             if data.get('distance') is None:
                 raise serializers.ValidationError({'distance': 'This field is required for distance-based activities.'})
 
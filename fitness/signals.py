@@ -0,0 +1,85 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Activity, Leaderboard
+
+# Fields that determine an activity's contribution to the leaderboard
+_CONTRIBUTION_FIELDS = ('user_id', 'date', 'distance', 'calories_burned')
+
+
+def _contribution(instance):
+    """
+    Return the leaderboard-relevant values of an activity instance.
+    Values are run through the model fields, since they may still be
+    unconverted input (e.g. a date string) when the instance is saved.
+    """
+    return {
+        name: Activity._meta.get_field(name).to_python(getattr(instance, name))
+        for name in _CONTRIBUTION_FIELDS
+    }
+
+
+def _apply(values, sign):
+    """
+    Add (sign=1) or remove (sign=-1) a contribution from its leaderboard entry.
+    """
+    Leaderboard.apply_activity_delta(
+        values['user_id'], values['date'].month, values['date'].year,
+        activities=sign,
+        distance=sign * (values['distance'] or 0),
+        calories_burned=sign * values['calories_burned'],
+    )
+
+
+def _entry_key(values):
+    """
+    Identify the leaderboard entry a contribution belongs to.
+    """
+    return values['user_id'], values['date'].month, values['date'].year
+
+
+@receiver(pre_save, sender=Activity)
+def capture_previous_activity(sender, instance, **kwargs):
+    """
+    Remember the stored values of an activity before it is updated,
+    so the leaderboard can be adjusted by the difference.
+    """
+    instance._previous_values = None
+    if kwargs.get('raw'):
+        return  # Fixtures carry their own leaderboard rows
+    if instance.pk:
+        instance._previous_values = Activity.objects.filter(pk=instance.pk).values(
+            *_CONTRIBUTION_FIELDS
+        ).first()
+
+
+@receiver(post_save, sender=Activity)
+def update_leaderboard_on_save(sender, instance, created, **kwargs):
+    """
+    Keep the leaderboard entry in sync when an activity is created or updated.
+    """
+    if kwargs.get('raw'):
+        return  # Fixtures carry their own leaderboard rows
+    previous = getattr(instance, '_previous_values', None)
+    current = _contribution(instance)
+
+    if previous and _entry_key(previous) == _entry_key(current):
+        # Same leaderboard entry: apply only the difference
+        Leaderboard.apply_activity_delta(
+            *_entry_key(current),
+            distance=(current['distance'] or 0) - (previous['distance'] or 0),
+            calories_burned=current['calories_burned'] - previous['calories_burned'],
+        )
+        return
+
+    if previous:
+        # The activity moved to another entry: remove its old contribution
+        _apply(previous, -1)
+    _apply(current, 1)
+
+
+@receiver(post_delete, sender=Activity)
+def update_leaderboard_on_delete(sender, instance, **kwargs):
+    """
+    Remove a deleted activity's contribution from the leaderboard.
+    """
+    _apply(_contribution(instance), -1)
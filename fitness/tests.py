@@ -1,3 +1,230 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from .models import Activity, Leaderboard
 
-# Create your tests here.
+
+class LeaderboardSignalTests(TestCase):
+    """
+    The leaderboard is kept in sync incrementally as activities are saved and deleted.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(username='runner', password='secret')
+        self.other = User.objects.create_user(username='cyclist', password='secret')
+
+    def entry(self, user, month=10, year=2026):
+        return Leaderboard.objects.get(user=user, month=month, year=year)
+
+    def create_activity(self, **kwargs):
+        values = {
+            'user': self.user, 'activity_type': 'Running', 'duration': 30,
+            'distance': Decimal('5.00'), 'calories_burned': 300, 'date': date(2026, 10, 6),
+        }
+        values.update(kwargs)
+        return Activity.objects.create(**values)
+
+    def test_create_builds_and_increments_entry(self):
+        self.create_activity()
+        self.create_activity(distance=Decimal('2.50'), calories_burned=150)
+
+        entry = self.entry(self.user)
+        self.assertEqual(entry.total_activities, 2)
+        self.assertEqual(entry.total_distance, Decimal('7.50'))
+        self.assertEqual(entry.total_calories_burned, 450)
+
+    def test_create_increments_existing_entry_without_recompute(self):
+        Leaderboard.objects.create(user=self.user, month=10, year=2026, total_activities=3, total_calories_burned=900)
+        self.create_activity()
+
+        entry = self.entry(self.user)
+        self.assertEqual(entry.total_activities, 4)
+        self.assertEqual(entry.total_calories_burned, 1200)
+
+    def test_create_accepts_date_string(self):
+        self.create_activity(date='2026-10-06')
+
+        self.assertEqual(self.entry(self.user).total_activities, 1)
+
+    def test_create_without_distance(self):
+        self.create_activity(activity_type='Weightlifting', distance=None, calories_burned=200)
+
+        entry = self.entry(self.user)
+        self.assertEqual(entry.total_distance, Decimal('0.00'))
+        self.assertEqual(entry.total_calories_burned, 200)
+
+    def test_update_applies_difference(self):
+        activity = self.create_activity()
+        activity.distance = Decimal('8.00')
+        activity.calories_burned = 500
+        activity.save()
+
+        entry = self.entry(self.user)
+        self.assertEqual(entry.total_activities, 1)
+        self.assertEqual(entry.total_distance, Decimal('8.00'))
+        self.assertEqual(entry.total_calories_burned, 500)
+
+    def test_update_moves_contribution_between_entries(self):
+        self.create_activity()
+        activity = self.create_activity(distance=Decimal('2.00'), calories_burned=100)
+        activity.date = date(2026, 11, 2)
+        activity.user = self.other
+        activity.save()
+
+        old_entry = self.entry(self.user)
+        self.assertEqual(old_entry.total_activities, 1)
+        self.assertEqual(old_entry.total_distance, Decimal('5.00'))
+        self.assertEqual(old_entry.total_calories_burned, 300)
+
+        new_entry = self.entry(self.other, month=11)
+        self.assertEqual(new_entry.total_activities, 1)
+        self.assertEqual(new_entry.total_distance, Decimal('2.00'))
+        self.assertEqual(new_entry.total_calories_burned, 100)
+
+    def test_delete_removes_contribution(self):
+        self.create_activity()
+        activity = self.create_activity(distance=Decimal('2.00'), calories_burned=100)
+        activity.delete()
+
+        entry = self.entry(self.user)
+        self.assertEqual(entry.total_activities, 1)
+        self.assertEqual(entry.total_distance, Decimal('5.00'))
+        self.assertEqual(entry.total_calories_burned, 300)
+
+    def test_entry_matches_full_recompute(self):
+        self.create_activity()
+        activity = self.create_activity(distance=Decimal('2.00'), calories_burned=100)
+        activity.calories_burned = 120
+        activity.save()
+
+        entry = self.entry(self.user)
+        rebuilt = Leaderboard.update_leaderboard(self.user, 10, 2026)
+        self.assertEqual(
+            (entry.total_activities, entry.total_distance, entry.total_calories_burned),
+            (rebuilt.total_activities, rebuilt.total_distance, rebuilt.total_calories_burned),
+        )
+
+
+class LeaderboardFixtureTests(TestCase):
+    fixtures = ['leaderboard_sample']
+
+    def test_loading_fixture_keeps_its_leaderboard_rows(self):
+        entry = Leaderboard.objects.get(user_id=100, month=10, year=2026)
+        self.assertEqual(entry.pk, 100)
+        self.assertEqual(entry.total_activities, 1)
+        self.assertEqual(Leaderboard.objects.count(), 1)
+
+
+class ActivityApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='runner', password='secret')
+        self.client.force_authenticate(self.user)
+
+    def test_first_activity_of_month_creates_entry(self):
+        response = self.client.post(reverse('activity-list'), {
+            'activity_type': 'Running', 'duration': 30, 'distance': '5.00',
+            'calories_burned': 300, 'date': '2026-10-06',
+        })
+
+        self.assertEqual(response.status_code, 201)
+        entry = Leaderboard.objects.get(user=self.user, month=10, year=2026)
+        self.assertEqual(entry.total_activities, 1)
+
+
+class LeaderboardApiTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='runner', password='secret')
+        self.client.force_authenticate(self.user)
+        for index in range(5):
+            user = User.objects.create_user(username=f'user{index}', password='secret')
+            Leaderboard.objects.create(
+                user=user, month=10, year=2026,
+                total_activities=index % 2, total_distance=Decimal('1.00'), total_calories_burned=index,
+            )
+
+    def test_list_is_ranked_and_paginated(self):
+        response = self.client.get(reverse('leaderboard-list'), {'month': 10, 'year': 2026, 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(
+            [row['total_calories_burned'] for row in response.data['results']],
+            [3, 1],
+        )
+        self.assertIn('page=2', response.data['next'])
+
+    def test_page_size_is_capped(self):
+        for index in range(5, 205):
+            Leaderboard.objects.create(user=User.objects.create_user(username=f'user{index}'), month=10, year=2026)
+
+        response = self.client.get(reverse('leaderboard-list'), {'month': 10, 'year': 2026, 'page_size': 500})
+
+        self.assertEqual(response.data['count'], 205)
+        self.assertEqual(len(response.data['results']), 200)
+
+    def test_invalid_period_is_rejected(self):
+        url = reverse('leaderboard-list')
+
+        for params, field in [({'month': 'oct'}, 'month'), ({'month': 13}, 'month'),
+                              ({'year': 'abc'}, 'year'), ({'year': 1999}, 'year')]:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(field, response.data)
+
+    @override_settings(ALLOWED_HOSTS=['one.example.com', 'two.example.com'])
+    def test_cached_page_links_follow_request_host(self):
+        url = reverse('leaderboard-list')
+        params = {'month': 10, 'year': 2026, 'page_size': 2}
+
+        first = self.client.get(url, params, HTTP_HOST='one.example.com')
+        second = self.client.get(url, params, HTTP_HOST='two.example.com')
+
+        self.assertIn('one.example.com', first.data['next'])
+        self.assertIn('two.example.com', second.data['next'])
+
+
+class LeaderboardBulkRefreshTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='runner', password='secret')
+        self.idle = User.objects.create_user(username='idle', password='secret')
+
+    def test_refresh_rebuilds_and_zeroes_stale_entries(self):
+        Activity.objects.create(
+            user=self.user, activity_type='Running', duration=30,
+            distance=Decimal('5.00'), calories_burned=300, date=date(2026, 10, 6),
+        )
+        Leaderboard.objects.filter(user=self.user).update(total_activities=9)
+        Leaderboard.objects.create(user=self.idle, month=10, year=2026, total_activities=5)
+
+        refreshed = Leaderboard.bulk_refresh(10, 2026)
+
+        self.assertEqual(refreshed, 1)
+        entry = Leaderboard.objects.get(user=self.user, month=10, year=2026)
+        self.assertEqual(entry.total_activities, 1)
+        self.assertEqual(entry.total_distance, Decimal('5.00'))
+        stale = Leaderboard.objects.get(user=self.idle, month=10, year=2026)
+        self.assertEqual(stale.total_activities, 0)
+
+    def test_refresh_flushes_every_batch(self):
+        users = [self.user, self.idle, User.objects.create_user(username='third', password='secret')]
+        for index, user in enumerate(users, start=1):
+            for _ in range(index):
+                Activity.objects.create(
+                    user=user, activity_type='Running', duration=30,
+                    distance=Decimal('2.00'), calories_burned=100, date=date(2026, 10, 6),
+                )
+        Leaderboard.objects.update(total_activities=0, total_distance=0, total_calories_burned=0)
+
+        refreshed = Leaderboard.bulk_refresh(10, 2026, batch_size=1)
+
+        self.assertEqual(refreshed, 3)
+        for index, user in enumerate(users, start=1):
+            entry = Leaderboard.objects.get(user=user, month=10, year=2026)
+            self.assertEqual(entry.total_activities, index)
+            self.assertEqual(entry.total_distance, Decimal('2.00') * index)
+            self.assertEqual(entry.total_calories_burned, 100 * index)
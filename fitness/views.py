@@ -1,13 +1,16 @@
+import hashlib
 from django.contrib.auth.models import User
 from rest_framework import viewsets, permissions, filters
 from .models import Activity, Leaderboard
 from .serializers import UserSerializer, ActivitySerializer, LeaderboardSerializer
 from datetime import timedelta
 from django.utils import timezone
+from django.core.cache import cache
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.db.models import Sum
+from django.db.models import Sum, Count, Q
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 # Custom permission class to restrict activity management to the owner
 
 
@@ -35,9 +38,11 @@ class UserViewSet(viewsets.ModelViewSet):
         Optionally restricts the returned users to the currently authenticated user.
         Allows superusers to view all profiles.
         """
-        if self.request.user.is_superuser:
-            return User.objects.all()  # Allow superusers to view all profiles
-        return User.objects.filter(id=self.request.user.id)
+        user = self.request.user
+        users = User.objects.only('id', 'username', 'email')
+        if user.is_superuser:
+            return users.all()  # Allow superusers to view all profiles
+        return users.filter(pk=user.pk)
 
 class ActivityViewSet(viewsets.ModelViewSet):
     """
@@ -50,26 +55,27 @@ class ActivityViewSet(viewsets.ModelViewSet):
 
     filter_backends = (filters.OrderingFilter,)
     ordering_fields = ['date', 'duration', 'calories_burned']
-    ordering = ['-date']  # Default ordering by date (newest first)
+    ordering = ['-date', '-id']  # Default ordering by date (newest first)
 
     def get_queryset(self):
         """
         Only allow users to view their own activities with optional filters.
         """
-        queryset = Activity.objects.filter(user=self.request.user)
+        query_params = self.request.query_params
+        conditions = Q(user=self.request.user)
 
         # Optional filtering by activity type
-        activity_type = self.request.query_params.get('activity_type')
+        activity_type = query_params.get('activity_type')
         if activity_type:
-            queryset = queryset.filter(activity_type=activity_type)
+            conditions &= Q(activity_type=activity_type)
 
         # Optional filtering by date range
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
+        start_date = query_params.get('start_date')
+        end_date = query_params.get('end_date')
         if start_date and end_date:
-            queryset = queryset.filter(date__range=[start_date, end_date])
+            conditions &= Q(date__range=[start_date, end_date])
 
-        return queryset
+        return Activity.objects.filter(conditions)
 
     def perform_create(self, serializer):
         """
@@ -85,10 +91,9 @@ class ActivityViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         """
-        Ensure users can only delete their own activities.
+        Delete the activity. Ownership is already enforced by IsOwnerOrReadOnly.
         """
-        if instance.user == self.request.user:
-            instance.delete()
+        instance.delete()
 
     @action(detail=False, methods=['get'], url_path='metrics')
     def activity_metrics(self, request):
@@ -108,26 +113,36 @@ class ActivityViewSet(viewsets.ModelViewSet):
         start_of_week = today - timedelta(days=today.weekday())
         start_of_month = today.replace(day=1)
 
-        # Aggregate metrics for the user
-        total_duration = Activity.objects.filter(user=user).aggregate(Sum('duration'))['duration__sum'] or 0
-        total_distance = Activity.objects.filter(user=user).exclude(distance=None).aggregate(Sum('distance'))['distance__sum'] or 0
-        total_calories_burned = Activity.objects.filter(user=user).aggregate(Sum('calories_burned'))['calories_burned__sum'] or 0
-        
-        # Weekly and monthly activity counts
-        weekly_activities = Activity.objects.filter(user=user, date__gte=start_of_week).count()
-        monthly_activities = Activity.objects.filter(user=user, date__gte=start_of_month).count()
+        # Aggregate all metrics for the user in a single query
+        totals = Activity.objects.filter(user=user).aggregate(
+            total_duration=Sum('duration'),
+            total_distance=Sum('distance'),
+            total_calories_burned=Sum('calories_burned'),
+            weekly_activities=Count('id', filter=Q(date__gte=start_of_week)),
+            monthly_activities=Count('id', filter=Q(date__gte=start_of_month)),
+        )
 
         # Prepare the response data
         metrics = {
-            'total_duration': total_duration,
-            'total_distance': total_distance,
-            'total_calories_burned': total_calories_burned,
-            'weekly_activities': weekly_activities,
-            'monthly_activities': monthly_activities,
+            'total_duration': totals['total_duration'] or 0,
+            'total_distance': totals['total_distance'] or 0,
+            'total_calories_burned': totals['total_calories_burned'] or 0,
+            'weekly_activities': totals['weekly_activities'],
+            'monthly_activities': totals['monthly_activities'],
         }
 
         return Response(metrics)
 
+class LeaderboardPagination(PageNumberPagination):
+    """
+    Page-number pagination for the leaderboard with a bounded page size.
+    The exact COUNT per page is kept: it is a (year, month) prefix range on
+    lb_period_ranking_idx, and pages are cached by LeaderboardViewSet.list.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
 class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
     """
     A viewset to display the leaderboard, allowing users to see rankings.
@@ -135,15 +150,84 @@ class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Leaderboard.objects.all()
     serializer_class = LeaderboardSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = PageNumberPagination  # Add pagination
+    pagination_class = LeaderboardPagination  # Add pagination
+
+    cache_timeout = 30  # Seconds a rendered leaderboard page is reused
+
+    def get_period(self):
+        """
+        Return the (month, year) requested in the query, defaulting to the current month and year.
+        The values are parsed once per request; invalid values are rejected with a 400 response.
+        """
+        if not hasattr(self, '_period'):
+            now = timezone.now()
+            month = self.parse_period_param('month', now.month, 1, 12)
+            year = self.parse_period_param('year', now.year, 2000)
+            self._period = (month, year)
+        return self._period
+
+    def parse_period_param(self, name, default, min_value, max_value=None):
+        """
+        Parse an integer query parameter, rejecting non-integer or out-of-range values.
+        """
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: f'{name.capitalize()} must be an integer.'})
+        if value < min_value or (max_value is not None and value > max_value):
+            if max_value is None:
+                raise ValidationError({name: f'{name.capitalize()} must be at least {min_value}.'})
+            raise ValidationError({name: f'{name.capitalize()} must be between {min_value} and {max_value}.'})
+        return value
 
     def get_queryset(self):
         """
         Filter the leaderboard by month and year if provided in query.
         Default to current month and year.
         """
-        month = self.request.query_params.get('month', timezone.now().month)
-        year = self.request.query_params.get('year', timezone.now().year)
+        month, year = self.get_period()
         return Leaderboard.objects.filter(month=month, year=year).order_by(
-            '-total_activities', '-total_distance', '-total_calories_burned'
+            '-total_activities', '-total_distance', '-total_calories_burned', '-id'
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serve leaderboard pages from the cache, since every user requesting
+        the same month, year and page gets an identical response.
+        The key covers the full request URL, as the pagination links embed its scheme and host.
+        """
+        month, year = self.get_period()
+        url_hash = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+        cache_key = f"lb:{year}:{month}:{url_hash}"
+
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_leaderboard_page().data
+            cache.set(cache_key, data, timeout=self.cache_timeout)
+        return Response(data)
+
+    def get_leaderboard_page(self):
+        """
+        Build a paginated leaderboard page from a values() projection,
+        skipping model instantiation and per-row serializer dispatch.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            'user_id', 'total_activities', 'total_distance', 'total_calories_burned', 'month', 'year'
         )
+        page = self.paginate_queryset(queryset)
+
+        # Keep the same representation of distances as LeaderboardSerializer
+        distance_field = LeaderboardSerializer().fields['total_distance']
+        rows = [
+            {
+                'user': row['user_id'],
+                'total_activities': row['total_activities'],
+                'total_distance': distance_field.to_representation(row['total_distance']),
+                'total_calories_burned': row['total_calories_burned'],
+                'month': row['month'],
+                'year': row['year'],
+            }
+            for row in page
+        ]
+        return self.get_paginated_response(rows)